@@ -1,12 +1,13 @@
 # app.py
-from flask import Flask, render_template, jsonify, send_file
+from flask import Flask, Response, request, render_template, jsonify, send_file, after_this_request
 import traceback
 import io
 from datetime import datetime
 import os
+import tempfile
 import threading
 import time
-import copy
+import orjson
 
 # Import extra para PDF (corrige o erro de mm)
 from reportlab.lib.units import mm  # ✅ corrigido aqui
@@ -18,32 +19,37 @@ app = Flask(__name__)
 # -------------------------
 try:
     from monitor import ensure_started, LATEST_DATA, get_status_data as monitor_get_status_data, gerar_relatorio_pdf
+    from monitor import get_latest_payload, set_latest_data
+    import monitor as _monitor
 except Exception:
     try:
-        from monitor import get_status_data as monitor_get_status_data
+        from monitor import get_status_data as monitor_get_status_data, set_latest_data
+        import monitor as _monitor
     except Exception:
         monitor_get_status_data = None
+        set_latest_data = None
+        _monitor = None
     ensure_started = None
     LATEST_DATA = None
     gerar_relatorio_pdf = None
+    get_latest_payload = None
 
 # -------------------------
 # CONFIGURAÇÕES
 # -------------------------
 DATA_REFRESH_SECONDS = 5  # intervalo de atualização no fallback
 FALLBACK_MONITOR_THREAD_NAME = "fallback_monitor_thread"
-LOCK = threading.Lock()
-
-# Cache local caso o monitor não exporte LATEST_DATA
-_local_latest = {}
 
 # -------------------------
 # FUNÇÕES DE MONITORAMENTO
 # -------------------------
 def _fallback_monitor_loop():
-    """Executa atualizações periódicas caso o monitor não tenha thread própria."""
-    global _local_latest
-    if not callable(monitor_get_status_data):
+    """Executa atualizações periódicas caso o monitor não tenha thread própria.
+
+    Publica no mesmo cache do monitor (monitor.LATEST_DATA), que é a única
+    fonte consultada por _get_current_data.
+    """
+    if not callable(monitor_get_status_data) or not callable(set_latest_data):
         print("[FALLBACK MONITOR] monitor_get_status_data indisponível.")
         return
 
@@ -51,8 +57,8 @@ def _fallback_monitor_loop():
     while True:
         try:
             data = monitor_get_status_data()
-            with LOCK:
-                _local_latest = data.copy() if isinstance(data, dict) else {}
+            if isinstance(data, dict):
+                set_latest_data(data)
         except Exception:
             print("[FALLBACK MONITOR] Erro ao atualizar dados.")
             traceback.print_exc()
@@ -80,18 +86,17 @@ else:
 # FUNÇÃO AUXILIAR
 # -------------------------
 def _get_current_data():
-    """Obtém snapshot atual do cache (ou executa monitor_get_status_data)."""
-    try:
-        if isinstance(LATEST_DATA, dict) and LATEST_DATA.get("timestamps") is not None:
-            with LOCK:
-                return copy.deepcopy(LATEST_DATA)
-    except Exception:
-        pass
+    """Obtém snapshot atual do cache (ou executa monitor_get_status_data).
 
+    Os snapshots são substituídos por inteiro a cada ciclo e nunca alterados
+    depois de publicados, então basta ler a referência (sem lock, sem cópia).
+    Quem chama deve tratar o resultado como somente leitura.
+    """
     try:
-        if isinstance(_local_latest, dict) and _local_latest.get("timestamps") is not None:
-            with LOCK:
-                return copy.deepcopy(_local_latest)
+        # lê o atributo do módulo: o nome importado ficaria preso ao dict inicial
+        snap = getattr(_monitor, "LATEST_DATA", LATEST_DATA)
+        if isinstance(snap, dict) and snap.get("timestamps") is not None:
+            return snap
     except Exception:
         pass
 
@@ -129,8 +134,20 @@ def graficos():
 def data():
     """Endpoint que fornece os dados em tempo real para o painel."""
     try:
+        # caminho rápido: JSON já serializado pelo monitor a cada ciclo
+        payload, etag = get_latest_payload() if callable(get_latest_payload) else (None, None)
+        if payload:
+            # snapshot igual ao que o painel já tem: só os cabeçalhos
+            if request.if_none_match.contains_weak(etag):
+                resp = Response(status=304)
+            else:
+                resp = Response(payload, mimetype='application/json')
+            resp.set_etag(etag)
+            resp.headers['Cache-Control'] = 'no-cache'
+            return resp
+
         dados = _get_current_data()
-        return jsonify(copy.deepcopy(dados))
+        return Response(orjson.dumps(dados, option=orjson.OPT_SORT_KEYS), mimetype='application/json')
     except Exception:
         traceback.print_exc()
         return jsonify({
@@ -148,41 +165,59 @@ def download_relatorio():
     """Gera e retorna o relatório PDF."""
     try:
         dados = _get_current_data()
+        agora_dt = datetime.now()
+        nome_arquivo = f"relatorio_monitoramento_{agora_dt.strftime('%Y%m%d_%H%M%S')}.pdf"
 
         # Usa a função personalizada do monitor se existir
         if callable(gerar_relatorio_pdf):
             try:
-                resultado = gerar_relatorio_pdf(dados)
+                resultado = gerar_relatorio_pdf(dados, return_bytes=True)
+                if isinstance(resultado, bytes):
+                    return send_file(io.BytesIO(resultado),
+                                     as_attachment=True,
+                                     download_name=nome_arquivo,
+                                     mimetype="application/pdf")
                 if isinstance(resultado, str) and os.path.exists(resultado):
                     return send_file(resultado,
                                      as_attachment=True,
-                                     download_name=f"relatorio_monitoramento_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+                                     download_name=nome_arquivo,
                                      mimetype="application/pdf")
                 if hasattr(resultado, "read"):
                     resultado.seek(0)
                     return send_file(resultado,
                                      as_attachment=True,
-                                     download_name=f"relatorio_monitoramento_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+                                     download_name=nome_arquivo,
                                      mimetype="application/pdf")
             except Exception:
                 print("[WARN] gerar_relatorio_pdf falhou — usando fallback.")
                 traceback.print_exc()
 
         # -------------------------
-        # Fallback: Gera PDF simples em memória
+        # Fallback: Gera PDF simples em arquivo temporário
         # -------------------------
         from reportlab.lib.pagesizes import A4
         from reportlab.lib.styles import getSampleStyleSheet
         from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
         from reportlab.lib import colors
 
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4,
+        # grava direto em disco (sem manter o documento inteiro em memória)
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+            tmp_path = tmp.name
+
+        @after_this_request
+        def _remove_tmp(response):
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return response
+
+        doc = SimpleDocTemplate(tmp_path, pagesize=A4,
                                 leftMargin=18*mm, rightMargin=18*mm, topMargin=25*mm, bottomMargin=20*mm)
         styles = getSampleStyleSheet()
         story = []
 
-        agora = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+        agora = agora_dt.strftime("%d/%m/%Y %H:%M:%S")
 
         # Adiciona logo se existir
         logo_path = os.path.join(app.static_folder or "static", "images", "logo_inovatus.png")
@@ -232,10 +267,9 @@ def download_relatorio():
             story.append(tabela)
 
         doc.build(story)
-        buffer.seek(0)
-        return send_file(buffer,
+        return send_file(tmp_path,
                          as_attachment=True,
-                         download_name=f"relatorio_monitoramento_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+                         download_name=nome_arquivo,
                          mimetype="application/pdf")
 
     except Exception:
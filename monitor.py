@@ -1,10 +1,21 @@
 import os
-import requests
+import io
+import json
+import orjson
+import hashlib
+import asyncio
+import httpx
+import numpy as np
 import pytz
 import time
 import threading
+from functools import partial
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    from fastrlock.rlock import FastRLock as _Lock  # lock em Cython, bem mais barato sem contenção
+except ImportError:
+    _Lock = threading.RLock
 
 # --- ReportLab ---
 from reportlab.lib.pagesizes import A4
@@ -12,7 +23,8 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import mm
-from collections import Counter, defaultdict
+from reportlab.lib.utils import ImageReader
+from collections import Counter, defaultdict, deque
 
 # ===============================
 # CONFIGURAÇÃO BÁSICA
@@ -21,11 +33,10 @@ CUIABA_TZ = pytz.timezone('America/Cuiaba')
 MAX_HISTORY_LEN = 100  # histórico p/ gráficos
 CHECK_INTERVAL = 5     # segundos entre verificações
 
-# --- Conexões persistentes (muito mais rápido) ---
-_session = requests.Session()
-_adapter = requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=10)
-_session.mount('https://', _adapter)
-_session.mount('http://', _adapter)
+# --- Event loop dedicado + cliente HTTP/2 persistente (criado dentro do loop) ---
+_loop = asyncio.new_event_loop()
+_loop_thread = None
+_client = None
 
 SITES = {
     'Alto Garças': 'https://altogarcas.celk.com.br/',
@@ -61,35 +72,73 @@ SITES = {
 ORDERED_NAMES = list(SITES.keys())
 
 # --- Estruturas de dados ---
-history = {site: [] for site in SITES}
-timestamps = []
-offline_time = {site: 0 for site in SITES}
-oscillation_detected = {site: False for site in SITES}
-lock = threading.Lock()
+# histórico em buffer circular: uma linha por unidade (ordem de ORDERED_NAMES)
+HIST = np.zeros((len(ORDERED_NAMES), MAX_HISTORY_LEN), dtype=np.uint8)
+_hist_idx = 0  # próxima coluna a ser escrita
+_hist_len = 0  # quantidade de amostras válidas no buffer
+timestamps = deque(maxlen=MAX_HISTORY_LEN)
+offline_time: dict[str, int] = {site: 0 for site in SITES}
+oscillation_detected: dict[str, bool] = {site: False for site in SITES}
+lock = _Lock()
 
 # Cache global (para o Flask)
 LATEST_DATA = {}
+_LATEST_PAYLOAD = (None, None)  # (LATEST_DATA serializado em bytes, ETag), pronto para o /data
 _thread_started = False
 
 # ===============================
 # MONITORAMENTO OTIMIZADO
 # ===============================
-def check_site(nome, url):
-    """Checa status HTTP da unidade (com sessão persistente)."""
+def _ensure_loop():
+    """Sobe (uma única vez) a thread que mantém o event loop das checagens."""
+    global _loop_thread
+    with lock:
+        if _loop_thread is None:
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="monitor_async_loop", daemon=True)
+            _loop_thread.start()
+
+
+async def check_site(client, nome, url):
+    """Checa status HTTP da unidade (com cliente persistente)."""
     try:
-        r = _session.get(url, timeout=4)
-        return nome, 1 if r.status_code == 200 else 0
+        # HEAD basta para o status; só cai para GET se o servidor não aceitar HEAD
+        r = await client.head(url)
+        status = r.status_code
+        if status in (405, 501):
+            # GET sem ler o corpo: a resposta é liberada ao sair do bloco
+            async with client.stream("GET", url) as r:
+                status = r.status_code
+        return nome, 1 if status == 200 else 0
     except Exception:
         return nome, 0
 
 
-def get_status_color(name):
-    data = history[name]
-    if len(data) < 2:
-        return 'green' if data and data[-1] == 1 else 'red'
-    if data[-1] != data[-2]:
-        return 'yellow'
-    return 'green' if data[-1] == 1 else 'red'
+async def _check_all_sites():
+    """Dispara todas as checagens de uma vez no event loop."""
+    global _client
+    if _client is None or _client.is_closed:
+        # HTTP/2 multiplexa as unidades que compartilham servidor e mantém o TLS entre ciclos
+        # pool dimensionado para todas as unidades de uma vez (sem reciclar conexões);
+        # retries=1 repete só falhas de conexão, e "identity" evita descomprimir o que é descartado
+        _client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=1,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=32, keepalive_expiry=60),
+            ),
+            headers={"Accept-Encoding": "identity"},
+            follow_redirects=True,
+            timeout=4.0,
+        )
+    results = await asyncio.gather(*(check_site(_client, n, u) for n, u in SITES.items()))
+    return dict(results)
+
+
+def _hist_ordered():
+    """Retorna o histórico em ordem cronológica (mais antigo -> mais recente)."""
+    if _hist_len < MAX_HISTORY_LEN:
+        return HIST[:, :_hist_len]
+    return np.concatenate((HIST[:, _hist_idx:], HIST[:, :_hist_idx]), axis=1)
 
 
 def get_status_data():
@@ -97,53 +146,63 @@ def get_status_data():
     current_dt = datetime.now(CUIABA_TZ)
     current_time = current_dt.strftime('%H:%M:%S')
 
-    status_dict = {}
-    with ThreadPoolExecutor(max_workers=8) as ex:
-        futures = {ex.submit(check_site, n, u): n for n, u in SITES.items()}
-        for fut in as_completed(futures):
-            nome, status = fut.result()
-            status_dict[nome] = status
+    _ensure_loop()
+    status_dict: dict[str, int] = asyncio.run_coroutine_threadsafe(_check_all_sites(), _loop).result()
+    status_vec = np.array([status_dict.get(n, 0) for n in ORDERED_NAMES], dtype=np.uint8)
 
+    global _hist_idx, _hist_len, offline_time, oscillation_detected
+    # get_status_data também pode ser chamado por threads de requisição (antes do
+    # primeiro snapshot) e pelo loop de fallback do app: a leitura do estado anterior,
+    # o cálculo e a publicação ficam todos sob o lock para não perder atualizações
     with lock:
-        if len(timestamps) >= MAX_HISTORY_LEN:
-            timestamps.pop(0)
-        timestamps.append(current_time)
-
-        relatorio_quedas = []
-        relatorio_oscilacoes = []
+        # oscilação = mudança em relação à amostra anterior (vetorizado)
+        if _hist_len:
+            oscillated = HIST[:, (_hist_idx - 1) % MAX_HISTORY_LEN] != status_vec
+        else:
+            oscillated = np.zeros(len(ORDERED_NAMES), dtype=bool)
 
-        for nome, status in status_dict.items():
-            if len(history[nome]) >= MAX_HISTORY_LEN:
-                history[nome].pop(0)
+        new_offline: dict[str, int] = {}
+        new_oscillation: dict[str, bool] = {}
+        relatorio_quedas: list[dict] = []
+        relatorio_oscilacoes: list[dict] = []
+        status_colors: dict[str, str] = {}
 
-            prev = history[nome][-1] if history[nome] else None
-            history[nome].append(status)
+        for i, nome in enumerate(ORDERED_NAMES):
+            status = int(status_vec[i])
 
             # offline progressivo
-            if status == 0:
-                offline_time[nome] += CHECK_INTERVAL
-            else:
-                offline_time[nome] = 0
+            ot = offline_time[nome] + CHECK_INTERVAL if status == 0 else 0
+            new_offline[nome] = ot
 
             # oscilação detectada
-            if prev is not None and prev != status:
-                oscillation_detected[nome] = True
+            # (a cor do status sai daqui mesmo, sem reprocessar o histórico)
+            if oscillated[i]:
+                new_oscillation[nome] = True
+                status_colors[nome] = 'yellow'
                 relatorio_oscilacoes.append({
                     "data": current_time, "nome": nome, "tempo": "-", "tipo": "Oscilação"
                 })
             else:
-                oscillation_detected[nome] = False
+                new_oscillation[nome] = False
+                status_colors[nome] = 'green' if status == 1 else 'red'
 
             # queda >= 5s
-            if offline_time[nome] >= 5:
+            if ot >= 5:
                 relatorio_quedas.append({
-                    "data": current_time, "nome": nome, "tempo": offline_time[nome], "tipo": "Queda"
+                    "data": current_time, "nome": nome, "tempo": ot, "tipo": "Queda"
                 })
 
+        HIST[:, _hist_idx] = status_vec
+        _hist_idx = (_hist_idx + 1) % MAX_HISTORY_LEN
+        _hist_len = min(_hist_len + 1, MAX_HISTORY_LEN)
+        timestamps.append(current_time)
+        offline_time = new_offline
+        oscillation_detected = new_oscillation
+
         return {
-            "timestamps": timestamps.copy(),
-            "data": {n: history[n].copy() for n in ORDERED_NAMES},
-            "status_colors": {n: get_status_color(n) for n in ORDERED_NAMES},
+            "timestamps": list(timestamps),
+            "data": dict(zip(ORDERED_NAMES, _hist_ordered().tolist())),
+            "status_colors": status_colors,
             "quedas": relatorio_quedas,
             "oscilacoes": relatorio_oscilacoes
         }
@@ -152,18 +211,31 @@ def get_status_data():
 # ===============================
 # LOOP DE MONITORAMENTO EM THREAD
 # ===============================
+def set_latest_data(new_data):
+    """Publica um novo snapshot (e sua versão JSON) para o Flask."""
+    global LATEST_DATA, _LATEST_PAYLOAD
+    # serializa uma vez por ciclo, fora do caminho das requisições
+    new_json = orjson.dumps(new_data, option=orjson.OPT_SORT_KEYS)
+    new_etag = hashlib.md5(new_json).hexdigest()
+    # publica por troca de referência (atômica): leitores não precisam de lock
+    LATEST_DATA = new_data
+    _LATEST_PAYLOAD = (new_json, new_etag)
+
+
 def _background_loop():
-    global LATEST_DATA
     while True:
         try:
-            new_data = get_status_data()
-            with lock:
-                LATEST_DATA = new_data
+            set_latest_data(get_status_data())
         except Exception as e:
             print(f"[MONITOR LOOP ERRO] {e}")
         time.sleep(CHECK_INTERVAL)
 
 
+def get_latest_payload():
+    """Retorna ``(json_bytes, etag)`` do último snapshot (ambos None antes do 1º ciclo)."""
+    return _LATEST_PAYLOAD
+
+
 def ensure_started():
     """Garante que o monitor de background esteja ativo."""
     global _thread_started
@@ -184,8 +256,97 @@ RED = colors.HexColor("#DC2626")
 AMBER = colors.HexColor("#D97706")
 ROW_ALT = colors.HexColor("#F5F7FA")
 
-
-def _header_footer(canvas, doc):
+# estilos fixos do relatório (montados uma única vez)
+_BASE_STYLES = getSampleStyleSheet()
+_H2_STYLE = ParagraphStyle("h2", parent=_BASE_STYLES["Heading2"], textColor=DARK, spaceAfter=6)
+_NORMAL_STYLE = ParagraphStyle("normal", parent=_BASE_STYLES["Normal"], fontSize=10, leading=14, textColor=DARK)
+_MUTED_STYLE = ParagraphStyle("muted", parent=_BASE_STYLES["Normal"], fontSize=10, textColor=MUTED)
+_BADGE_RED = ParagraphStyle("badge_red", parent=_BASE_STYLES["Normal"], alignment=1, textColor=colors.white,
+                            backColor=RED, fontSize=9, leading=12, spaceBefore=2, spaceAfter=2)
+_BADGE_AMBER = ParagraphStyle("badge_amber", parent=_BASE_STYLES["Normal"], alignment=1, textColor=colors.white,
+                              backColor=AMBER, fontSize=9, leading=12, spaceBefore=2, spaceAfter=2)
+_RESUMO_TBL_STYLE = TableStyle([
+    ("BACKGROUND", (0,0), (-1,0), ROW_ALT),
+    ("ALIGN", (0,0), (-1,-1), "CENTER"),
+    ("VALIGN", (0,0), (-1,-1), "MIDDLE"),
+    ("BOX", (0,0), (-1,-1), 0.6, colors.HexColor("#E5E7EB")),
+    ("INNERGRID", (0,0), (-1,-1), 0.25, colors.HexColor("#E5E7EB")),
+    ("TOPPADDING", (0,0), (-1,-1), 6),
+    ("BOTTOMPADDING", (0,0), (-1,-1), 6),
+])
+_TOP_TBL_STYLE = TableStyle([
+    ("BACKGROUND", (0,0), (-1,0), colors.HexColor("#111827")),
+    ("TEXTCOLOR", (0,0), (-1,0), colors.white),
+    ("FONTNAME", (0,0), (-1,0), "Helvetica-Bold"),
+    ("ALIGN", (1,1), (-1,-1), "CENTER"),
+    ("ROWBACKGROUNDS", (0,1), (-1,-1), [colors.white, ROW_ALT]),
+    ("LEFTPADDING", (0,0), (-1,-1), 8),
+    ("RIGHTPADDING", (0,0), (-1,-1), 8),
+    ("TOPPADDING", (0,0), (-1,-1), 6),
+    ("BOTTOMPADDING", (0,0), (-1,-1), 6),
+    ("GRID", (0,0), (-1,-1), 0.25, colors.HexColor("#E5E7EB")),
+])
+_INFO_TBL_STYLE = TableStyle([
+    ("BACKGROUND", (0,0), (-1,-1), ROW_ALT),
+    ("BOX", (0,0), (-1,-1), 0.6, colors.HexColor("#E5E7EB")),
+    ("LEFTPADDING", (0,0), (-1,-1), 10),
+    ("RIGHTPADDING", (0,0), (-1,-1), 10),
+    ("TOPPADDING", (0,0), (-1,-1), 8),
+    ("BOTTOMPADDING", (0,0), (-1,-1), 8),
+])
+_EVENTOS_TBL_STYLE = TableStyle([
+    ("BACKGROUND", (0,0), (-1,0), colors.HexColor("#111827")),
+    ("TEXTCOLOR", (0,0), (-1,0), colors.white),
+    ("FONTNAME", (0,0), (-1,0), "Helvetica-Bold"),
+    ("ALIGN", (0,0), (-1,0), "CENTER"),
+    ("ROWBACKGROUNDS", (0,1), (-1,-1), [colors.white, ROW_ALT]),
+    ("ALIGN", (0,1), (0,-1), "CENTER"),
+    ("ALIGN", (-2,1), (-2,-1), "CENTER"),
+    ("ALIGN", (-1,1), (-1,-1), "CENTER"),
+    ("LEFTPADDING", (0,0), (-1,-1), 8),
+    ("RIGHTPADDING", (0,0), (-1,-1), 8),
+    ("TOPPADDING", (0,1), (-1,-1), 6),
+    ("BOTTOMPADDING", (0,1), (-1,-1), 6),
+    ("LINEBELOW", (0,0), (-1,0), 0.6, colors.HexColor("#1F2937")),
+    ("GRID", (0,1), (-1,-1), 0.25, colors.HexColor("#E5E7EB")),
+])
+
+
+def _resolve_logo_path():
+    """Procura static/images/logo_inovatus.png relativo a este módulo."""
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    logo_path = os.path.join(module_dir, "static", "images", "logo_inovatus.png")
+    # fallback alternative path checks (caso a estrutura do projeto seja diferente)
+    if not os.path.exists(logo_path):
+        # tenta diretório pai
+        logo_path_alt = os.path.join(module_dir, "..", "static", "images", "logo_inovatus.png")
+        if os.path.exists(logo_path_alt):
+            logo_path = os.path.abspath(logo_path_alt)
+    return logo_path
+
+
+# logo carregada uma única vez (reaproveitada em todas as páginas/relatórios)
+LOGO_PATH = _resolve_logo_path()
+try:
+    _LOGO_READER = ImageReader(LOGO_PATH) if os.path.exists(LOGO_PATH) else None
+except Exception as e:
+    print("[PDF] Erro ao carregar a logo:", e)
+    _LOGO_READER = None
+
+# PDFs já gerados, indexados pelo conteúdo de quedas/oscilações: chave -> (bytes, expira_em)
+# (o PDF traz a hora de geração no cabeçalho, então cada entrada vale só _PDF_CACHE_TTL segundos)
+_pdf_cache = {}
+_PDF_CACHE_MAX = 8
+_PDF_CACHE_TTL = 60
+
+
+def _pdf_key(dados):
+    """Hash dos eventos que entram no relatório (chave do cache de PDF)."""
+    eventos = [dados.get("quedas", []), dados.get("oscilacoes", [])]
+    return hashlib.blake2b(json.dumps(eventos, sort_keys=True, default=str).encode(), digest_size=16).digest()
+
+
+def _header_footer(canvas, doc, dt_txt=""):
     """Desenha faixa superior, logo e informações no cabeçalho, e rodapé."""
     canvas.saveState()
     page_w, page_h = A4
@@ -195,26 +356,17 @@ def _header_footer(canvas, doc):
     canvas.setFillColor(PRIMARY)
     canvas.rect(0, page_h - header_h, page_w, header_h, fill=1, stroke=0)
 
-    # caminho da logo (procura static/images/logo_inovatus.png relativo a este módulo)
+    # logo (já carregada em _LOGO_READER)
     try:
-        module_dir = os.path.dirname(os.path.abspath(__file__))
-        logo_path = os.path.join(module_dir, "static", "images", "logo_inovatus.png")
-        # fallback alternative path checks (caso a estrutura do projeto seja diferente)
-        if not os.path.exists(logo_path):
-            # tenta diretório pai
-            logo_path_alt = os.path.join(module_dir, "..", "static", "images", "logo_inovatus.png")
-            if os.path.exists(logo_path_alt):
-                logo_path = os.path.abspath(logo_path_alt)
-
         # dimensões da logo (ajuste conforme necessário)
         logo_w = 36 * mm
         logo_h = 12 * mm
         logo_x = 12 * mm
         logo_y = page_h - header_h + ((header_h - logo_h) / 2)
 
-        if os.path.exists(logo_path):
+        if _LOGO_READER is not None:
             try:
-                canvas.drawImage(logo_path, logo_x, logo_y, width=logo_w, height=logo_h, mask='auto')
+                canvas.drawImage(_LOGO_READER, logo_x, logo_y, width=logo_w, height=logo_h, mask='auto')
             except Exception as e:
                 print("[PDF] Erro ao desenhar a logo:", e)
                 # desenha um placeholder discreto
@@ -222,7 +374,7 @@ def _header_footer(canvas, doc):
                 canvas.rect(logo_x, logo_y, 6 * mm, 6 * mm, fill=1, stroke=0)
         else:
             # log para debug: caminho não encontrado
-            print("[PDF] Logo não encontrada em:", logo_path)
+            print("[PDF] Logo não encontrada em:", LOGO_PATH)
             canvas.setFillColor(colors.white)
             canvas.rect(logo_x, logo_y, 6 * mm, 6 * mm, fill=1, stroke=0)
     except Exception as ex:
@@ -242,7 +394,6 @@ def _header_footer(canvas, doc):
     try:
         canvas.setFont("Helvetica", 9)
         canvas.setFillColor(colors.white)
-        dt_txt = datetime.now(CUIABA_TZ).strftime("Gerado em: %d/%m/%Y %H:%M:%S")
         canvas.drawRightString(page_w - 12 * mm, page_h - (header_h / 2) + 4, dt_txt)
     except Exception as e:
         print("[PDF] Erro ao desenhar data:", e)
@@ -258,8 +409,8 @@ def _header_footer(canvas, doc):
     canvas.restoreState()
 
 
-def gerar_relatorio_pdf(dados, arquivo_pdf="relatorio_monitoramento.pdf"):
-    """Gera PDF em disco e retorna o caminho (string)."""
+def _render_pdf(dados, destino):
+    """Monta o relatório em ``destino`` (caminho ou arquivo aberto)."""
     # prepara dados
     quedas = (dados.get("quedas") or [])
     oscs = (dados.get("oscilacoes") or [])
@@ -279,41 +430,25 @@ def gerar_relatorio_pdf(dados, arquivo_pdf="relatorio_monitoramento.pdf"):
     top5 = cont_por_unidade.most_common(5)
 
     # layout do PDF
-    doc = SimpleDocTemplate(arquivo_pdf, pagesize=A4,
+    doc = SimpleDocTemplate(destino, pagesize=A4,
                             leftMargin=18*mm, rightMargin=18*mm,
                             topMargin=35*mm, bottomMargin=20*mm)
-    styles = getSampleStyleSheet()
-    h2 = ParagraphStyle("h2", parent=styles["Heading2"], textColor=DARK, spaceAfter=6)
-    normal = ParagraphStyle("normal", parent=styles["Normal"], fontSize=10, leading=14, textColor=DARK)
-    muted = ParagraphStyle("muted", parent=styles["Normal"], fontSize=10, textColor=MUTED)
-    badge_red = ParagraphStyle("badge_red", parent=styles["Normal"], alignment=1, textColor=colors.white,
-                               backColor=RED, fontSize=9, leading=12, spaceBefore=2, spaceAfter=2)
-    badge_amber = ParagraphStyle("badge_amber", parent=styles["Normal"], alignment=1, textColor=colors.white,
-                                 backColor=AMBER, fontSize=9, leading=12, spaceBefore=2, spaceAfter=2)
 
     story = []
 
     # resumo topo
     resumo_data = [
-        [Paragraph("<b>Total de eventos</b>", normal), Paragraph("<b>Quedas</b>", normal),
-         Paragraph("<b>Oscilações</b>", normal), Paragraph("<b>Unidades afetadas</b>", normal)],
-        [Paragraph(str(total_eventos), h2), Paragraph(str(total_quedas), h2),
-         Paragraph(str(total_oscs), h2), Paragraph(str(unidades_afetadas), h2)]
+        [Paragraph("<b>Total de eventos</b>", _NORMAL_STYLE), Paragraph("<b>Quedas</b>", _NORMAL_STYLE),
+         Paragraph("<b>Oscilações</b>", _NORMAL_STYLE), Paragraph("<b>Unidades afetadas</b>", _NORMAL_STYLE)],
+        [Paragraph(str(total_eventos), _H2_STYLE), Paragraph(str(total_quedas), _H2_STYLE),
+         Paragraph(str(total_oscs), _H2_STYLE), Paragraph(str(unidades_afetadas), _H2_STYLE)]
     ]
     resumo_tbl = Table(resumo_data, colWidths=[doc.width/4]*4)
-    resumo_tbl.setStyle(TableStyle([
-        ("BACKGROUND", (0,0), (-1,0), ROW_ALT),
-        ("ALIGN", (0,0), (-1,-1), "CENTER"),
-        ("VALIGN", (0,0), (-1,-1), "MIDDLE"),
-        ("BOX", (0,0), (-1,-1), 0.6, colors.HexColor("#E5E7EB")),
-        ("INNERGRID", (0,0), (-1,-1), 0.25, colors.HexColor("#E5E7EB")),
-        ("TOPPADDING", (0,0), (-1,-1), 6),
-        ("BOTTOMPADDING", (0,0), (-1,-1), 6),
-    ]))
+    resumo_tbl.setStyle(_RESUMO_TBL_STYLE)
     story.append(resumo_tbl)
     story.append(Spacer(1, 8))
 
-    story.append(Paragraph("Top 5 unidades com mais quedas", muted))
+    story.append(Paragraph("Top 5 unidades com mais quedas", _MUTED_STYLE))
     top_rows = [["Unidade", "Quedas", "Tempo Offline (s)"]]
     if top5:
         for nome, cnt in top5:
@@ -321,100 +456,107 @@ def gerar_relatorio_pdf(dados, arquivo_pdf="relatorio_monitoramento.pdf"):
     else:
         top_rows.append(["—", "0", "0"])
     top_tbl = Table(top_rows, colWidths=[None, 28*mm, 40*mm])
-    top_tbl.setStyle(TableStyle([
-        ("BACKGROUND", (0,0), (-1,0), colors.HexColor("#111827")),
-        ("TEXTCOLOR", (0,0), (-1,0), colors.white),
-        ("FONTNAME", (0,0), (-1,0), "Helvetica-Bold"),
-        ("ALIGN", (1,1), (-1,-1), "CENTER"),
-        ("ROWBACKGROUNDS", (0,1), (-1,-1), [colors.white, ROW_ALT]),
-        ("LEFTPADDING", (0,0), (-1,-1), 8),
-        ("RIGHTPADDING", (0,0), (-1,-1), 8),
-        ("TOPPADDING", (0,0), (-1,-1), 6),
-        ("BOTTOMPADDING", (0,0), (-1,-1), 6),
-        ("GRID", (0,0), (-1,-1), 0.25, colors.HexColor("#E5E7EB")),
-    ]))
+    top_tbl.setStyle(_TOP_TBL_STYLE)
     story.append(top_tbl)
     story.append(Spacer(1, 14))
 
     # seção quedas
-    story.append(Paragraph("Tabela de Quedas", h2))
+    story.append(Paragraph("Tabela de Quedas", _H2_STYLE))
     if not quedas:
-        info_q = Table([[Paragraph("Nenhuma queda registrada no período.", normal)]], colWidths=[doc.width])
-        info_q.setStyle(TableStyle([
-            ("BACKGROUND", (0,0), (-1,-1), ROW_ALT),
-            ("BOX", (0,0), (-1,-1), 0.6, colors.HexColor("#E5E7EB")),
-            ("LEFTPADDING", (0,0), (-1,-1), 10),
-            ("RIGHTPADDING", (0,0), (-1,-1), 10),
-            ("TOPPADDING", (0,0), (-1,-1), 8),
-            ("BOTTOMPADDING", (0,0), (-1,-1), 8),
-        ]))
+        info_q = Table([[Paragraph("Nenhuma queda registrada no período.", _NORMAL_STYLE)]], colWidths=[doc.width])
+        info_q.setStyle(_INFO_TBL_STYLE)
         story.append(info_q)
     else:
         linhas_q = [["Data/Hora", "Unidade", "Tempo Offline", "Tipo"]]
         for e in sorted(quedas, key=lambda x: (x["data"], x["nome"])):
             tempo_fmt = f"{int(e['tempo'])} s" if isinstance(e.get("tempo"), (int, float)) else "-"
-            linhas_q.append([e["data"], e["nome"], tempo_fmt, Paragraph("Queda", badge_red)])
+            linhas_q.append([e["data"], e["nome"], tempo_fmt, Paragraph("Queda", _BADGE_RED)])
         tbl_q = Table(linhas_q, colWidths=[30*mm, None, 30*mm, 25*mm], repeatRows=1)
-        tbl_q.setStyle(TableStyle([
-            ("BACKGROUND", (0,0), (-1,0), colors.HexColor("#111827")),
-            ("TEXTCOLOR", (0,0), (-1,0), colors.white),
-            ("FONTNAME", (0,0), (-1,0), "Helvetica-Bold"),
-            ("ALIGN", (0,0), (-1,0), "CENTER"),
-            ("ROWBACKGROUNDS", (0,1), (-1,-1), [colors.white, ROW_ALT]),
-            ("ALIGN", (0,1), (0,-1), "CENTER"),
-            ("ALIGN", (-2,1), (-2,-1), "CENTER"),
-            ("ALIGN", (-1,1), (-1,-1), "CENTER"),
-            ("LEFTPADDING", (0,0), (-1,-1), 8),
-            ("RIGHTPADDING", (0,0), (-1,-1), 8),
-            ("TOPPADDING", (0,1), (-1,-1), 6),
-            ("BOTTOMPADDING", (0,1), (-1,-1), 6),
-            ("LINEBELOW", (0,0), (-1,0), 0.6, colors.HexColor("#1F2937")),
-            ("GRID", (0,1), (-1,-1), 0.25, colors.HexColor("#E5E7EB")),
-        ]))
+        tbl_q.setStyle(_EVENTOS_TBL_STYLE)
         story.append(KeepTogether(tbl_q))
 
     story.append(Spacer(1, 16))
 
     # seção oscilações
-    story.append(Paragraph("Tabela de Oscilações", h2))
+    story.append(Paragraph("Tabela de Oscilações", _H2_STYLE))
     if not oscs:
-        info_o = Table([[Paragraph("Nenhuma oscilação registrada no período.", normal)]], colWidths=[doc.width])
-        info_o.setStyle(TableStyle([
-            ("BACKGROUND", (0,0), (-1,-1), ROW_ALT),
-            ("BOX", (0,0), (-1,-1), 0.6, colors.HexColor("#E5E7EB")),
-            ("LEFTPADDING", (0,0), (-1,-1), 10),
-            ("RIGHTPADDING", (0,0), (-1,-1), 10),
-            ("TOPPADDING", (0,0), (-1,-1), 8),
-            ("BOTTOMPADDING", (0,0), (-1,-1), 8),
-        ]))
+        info_o = Table([[Paragraph("Nenhuma oscilação registrada no período.", _NORMAL_STYLE)]], colWidths=[doc.width])
+        info_o.setStyle(_INFO_TBL_STYLE)
         story.append(info_o)
     else:
         linhas_o = [["Data/Hora", "Unidade", "Tempo Offline", "Tipo"]]
         for e in sorted(oscs, key=lambda x: (x["data"], x["nome"])):
             tempo_fmt = f"{int(e['tempo'])} s" if isinstance(e.get("tempo"), (int, float)) else "-"
-            linhas_o.append([e["data"], e["nome"], tempo_fmt, Paragraph("Oscilação", badge_amber)])
+            linhas_o.append([e["data"], e["nome"], tempo_fmt, Paragraph("Oscilação", _BADGE_AMBER)])
         tbl_o = Table(linhas_o, colWidths=[30*mm, None, 30*mm, 30*mm], repeatRows=1)
-        tbl_o.setStyle(TableStyle([
-            ("BACKGROUND", (0,0), (-1,0), colors.HexColor("#111827")),
-            ("TEXTCOLOR", (0,0), (-1,0), colors.white),
-            ("FONTNAME", (0,0), (-1,0), "Helvetica-Bold"),
-            ("ALIGN", (0,0), (-1,0), "CENTER"),
-            ("ROWBACKGROUNDS", (0,1), (-1,-1), [colors.white, ROW_ALT]),
-            ("ALIGN", (0,1), (0,-1), "CENTER"),
-            ("ALIGN", (-2,1), (-2,-1), "CENTER"),
-            ("ALIGN", (-1,1), (-1,-1), "CENTER"),
-            ("LEFTPADDING", (0,0), (-1,-1), 8),
-            ("RIGHTPADDING", (0,0), (-1,-1), 8),
-            ("TOPPADDING", (0,1), (-1,-1), 6),
-            ("BOTTOMPADDING", (0,1), (-1,-1), 6),
-            ("LINEBELOW", (0,0), (-1,0), 0.6, colors.HexColor("#1F2937")),
-            ("GRID", (0,1), (-1,-1), 0.25, colors.HexColor("#E5E7EB")),
-        ]))
+        tbl_o.setStyle(_EVENTOS_TBL_STYLE)
         story.append(KeepTogether(tbl_o))
 
     # build
-    doc.build(story, onFirstPage=_header_footer, onLaterPages=_header_footer)
-    return arquivo_pdf
+    # data de geração calculada uma vez e repetida em todas as páginas
+    dt_txt = datetime.now(CUIABA_TZ).strftime("Gerado em: %d/%m/%Y %H:%M:%S")
+    header_footer = partial(_header_footer, dt_txt=dt_txt)
+    doc.build(story, onFirstPage=header_footer, onLaterPages=header_footer)
+
+
+def _build_pdf_bytes(dados):
+    """Gera o relatório em memória e retorna os bytes do PDF."""
+    buffer = io.BytesIO()
+    _render_pdf(dados, buffer)
+    return buffer.getvalue()
+
+
+def gerar_relatorio_pdf(dados, arquivo_pdf="relatorio_monitoramento.pdf", return_bytes=False):
+    """Gera PDF em disco e retorna o caminho (string).
+
+    Com ``return_bytes=True`` gera em memória e retorna os bytes, reaproveitando
+    o último PDF gerado para os mesmos eventos.
+    """
+    # caso comum (sem eventos): usa o relatório vazio pré-gerado
+    if not dados.get("quedas") and not dados.get("oscilacoes"):
+        pdf = _empty_pdf_bytes()
+        if return_bytes:
+            return pdf
+        with open(arquivo_pdf, "wb") as f:
+            f.write(pdf)
+        return arquivo_pdf
+
+    if not return_bytes:
+        _render_pdf(dados, arquivo_pdf)
+        return arquivo_pdf
+
+    key = _pdf_key(dados)
+    cached = _pdf_cache.get(key)
+    if cached is not None and cached[1] > time.monotonic():
+        return cached[0]
+    pdf = _build_pdf_bytes(dados)
+    with lock:
+        _pdf_cache.pop(key, None)
+        _pdf_cache[key] = (pdf, time.monotonic() + _PDF_CACHE_TTL)
+        while len(_pdf_cache) > _PDF_CACHE_MAX:
+            _pdf_cache.pop(next(iter(_pdf_cache)))
+    return pdf
+
+
+# relatório vazio pré-gerado: (bytes, expira_em); renovado a cada _PDF_CACHE_TTL
+# segundos para que o "Gerado em" do cabeçalho não fique desatualizado
+_EMPTY_PDF = (None, 0.0)
+
+
+def _empty_pdf_bytes():
+    """Retorna o relatório sem eventos, regerando-o quando expirado."""
+    global _EMPTY_PDF
+    pdf, expira_em = _EMPTY_PDF
+    if pdf is None or expira_em <= time.monotonic():
+        pdf = _build_pdf_bytes({"quedas": [], "oscilacoes": []})
+        _EMPTY_PDF = (pdf, time.monotonic() + _PDF_CACHE_TTL)
+    return pdf
+
+
+try:
+    _empty_pdf_bytes()
+except Exception as e:
+    print("[PDF] Erro ao pré-gerar relatório vazio:", e)
 
 
-__all__ = ["get_status_data", "gerar_relatorio_pdf", "LATEST_DATA", "ensure_started"]
+__all__ = ["get_status_data", "gerar_relatorio_pdf", "LATEST_DATA", "get_latest_payload", "set_latest_data", "ensure_started"]